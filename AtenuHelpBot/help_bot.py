@@ -1,18 +1,32 @@
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import asyncio
-import json
+import atexit
 import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
 from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+import orjson
 from telegram import Update
-from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
+from telegram.ext import ApplicationBuilder, ContextTypes, MessageHandler, filters
+
+# Paths are resolved from the repository root, not the current directory
+BASE_DIR = Path(__file__).resolve().parent.parent
+LOG_DIR = BASE_DIR / 'logs'
+CONFIG_FILE = BASE_DIR / 'configs' / 'tokens.json'
+TICKETS_FILE = BASE_DIR / 'data' / 'help_tickets.jsonl'
+
+# Create logs directory if it doesn't exist
+LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 # Configure logging with rotation to prevent large files
 def setup_logging():
     """Setup logging with rotation to prevent large files"""
-    # Create logs directory if it doesn't exist
-    os.makedirs('logs', exist_ok=True)
-    
     # Create formatter
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -25,7 +39,7 @@ def setup_logging():
     
     # Rotating file handler for help bot
     file_handler = RotatingFileHandler(
-        'logs/help_bot.log',
+        LOG_DIR / 'help_bot.log',
         maxBytes=5*1024*1024,   # 5MB per file
         backupCount=3,          # Keep 3 backup files
         encoding='utf-8'
@@ -33,23 +47,38 @@ def setup_logging():
     file_handler.setFormatter(formatter)
     file_handler.setLevel(logging.INFO)
     
+    # Handlers run on a background listener thread; log calls only enqueue
+    global _log_listener
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    _log_listener.start()
+    # Stop at interpreter exit (after later atexit hooks such as the ticket
+    # flush) so records logged right before exiting still reach the handlers
+    atexit.register(_log_listener.stop)
+    
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
+    root_logger.addHandler(QueueHandler(log_queue))
     
     return logging.getLogger(__name__)
 
 # Setup logging
+_log_listener = None
 logger = setup_logging()
 
+@lru_cache(maxsize=1)
+def _read_config(path, mtime_ns):
+    """Parse the config file (cached until its modification time changes)"""
+    return orjson.loads(path.read_bytes())
+
 # Load configuration from JSON file
 def load_config():
     """Load bot configuration from JSON file"""
     try:
-        with open('configs/tokens.json', 'r') as f:
-            config = json.load(f)
+        config = _read_config(CONFIG_FILE, CONFIG_FILE.stat().st_mtime_ns)
         return config['help_bot_token']
     except FileNotFoundError:
         logger.error("Config file not found. Please create configs/tokens.json")
@@ -65,6 +94,23 @@ if not BOT_TOKEN:
     logger.error("Bot token not found. Exiting.")
     exit(1)
 
+# Optional webhook mode (falls back to long polling when WEBHOOK_URL is unset)
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL")
+WH_SECRET = os.environ.get("WH_SECRET")
+WEBHOOK_PORT = 8443
+
+if WEBHOOK_URL:
+    if not WH_SECRET:
+        logger.error("WH_SECRET must be set when WEBHOOK_URL is set. Exiting.")
+        exit(1)
+    try:
+        WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", "8443"))
+    except ValueError:
+        WEBHOOK_PORT = 0
+    if not 0 < WEBHOOK_PORT < 65536:
+        logger.error("WEBHOOK_PORT must be a port number between 1 and 65535. Exiting.")
+        exit(1)
+
 # Pre-formatted response data with immutable tuple for better memory efficiency
 RESPONSES = {
     "start": "👋 Welcome to Atenu Help Bot!\nUse /help to see what I can do.",
@@ -89,41 +135,120 @@ RESPONSES = {
     "donate": "💖 Support free learning in Ethiopia: https://atenu.org/donate"
 }
 
-# Freeze the dictionary to prevent accidental modifications
-RESPONSES = dict(RESPONSES)
+# Intern the static response strings once and freeze the dictionary to
+# prevent accidental modifications (PTB only accepts str, not bytes, for text)
+RESPONSES = MappingProxyType({cmd: sys.intern(text) for cmd, text in RESPONSES.items()})
 
-# Cache command handlers to avoid recreation
-@lru_cache(maxsize=32)
-def get_cached_response(response_key):
-    """Cache responses to avoid dictionary lookups"""
-    return RESPONSES.get(response_key)
+# Known command names, used to skip lowercasing on the common path
+COMMANDS = frozenset(RESPONSES)
+
+# Help ticket log (append-only JSON Lines, checkpointed from memory)
+TICKETS_MAX_BYTES = 5*1024*1024  # 5MB per file
+TICKETS_BACKUP_COUNT = 3         # Keep 3 backup files
+TICKETS_FLUSH_INTERVAL = 60.0    # seconds between checkpoints
+
+# Interactions held in memory until the next checkpoint or shutdown
+_pending_interactions = deque()
+_tickets_file = None
+_tickets_lock = threading.Lock()
+_flush_task = None
 
-# Log user interactions for help tickets (optional - can be added later)
 def log_user_interaction(user_id, username, command):
-    """Log user interactions to help_tickets.json or database"""
-    try:
-        # Load existing data
+    """Queue a user interaction for the help ticket log"""
+    _pending_interactions.append({
+        "user_id": user_id,
+        "username": username,
+        "command": command,
+        "timestamp": time.time_ns()  # Wall-clock UNIX time in nanoseconds
+    })
+
+def _rotate_tickets_file():
+    """Rotate the ticket log the same way RotatingFileHandler does"""
+    global _tickets_file
+    _tickets_file.close()
+    _tickets_file = None
+    
+    for i in range(TICKETS_BACKUP_COUNT - 1, 0, -1):
+        src = f"{TICKETS_FILE}.{i}"
+        if os.path.exists(src):
+            os.replace(src, f"{TICKETS_FILE}.{i + 1}")
+    os.replace(TICKETS_FILE, f"{TICKETS_FILE}.1")
+
+def _drain_interactions():
+    """Take every queued interaction off the buffer"""
+    batch = []
+    while _pending_interactions:
+        batch.append(_pending_interactions.popleft())
+    return batch
+
+def _write_interactions(batch):
+    """Append a batch of interactions to the ticket log in a single write"""
+    global _tickets_file
+    if not batch:
+        return
+    
+    with _tickets_lock:
         try:
-            with open('data/help_tickets.json', 'r') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            data = {"interactions": []}
-        
-        # Add new interaction
-        interaction = {
-            "user_id": user_id,
-            "username": username,
-            "command": command,
-            "timestamp": asyncio.get_event_loop().time()
-        }
-        data["interactions"].append(interaction)
-        
-        # Save back to file
-        with open('data/help_tickets.json', 'w') as f:
-            json.dump(data, f, indent=2)
+            # Keep the file handle open across flushes
+            if _tickets_file is None:
+                TICKETS_FILE.parent.mkdir(parents=True, exist_ok=True)
+                _tickets_file = open(TICKETS_FILE, 'ab')
+            
+            _tickets_file.write(b''.join(orjson.dumps(x) + b'\n' for x in batch))
+            _tickets_file.flush()
+            os.fsync(_tickets_file.fileno())  # At most one fsync per batch
             
-    except Exception as e:
-        logger.error(f"Error logging user interaction: {e}")
+            if _tickets_file.tell() >= TICKETS_MAX_BYTES:
+                _rotate_tickets_file()
+        except Exception as e:
+            logger.error(f"Error logging user interactions: {e}")
+
+async def _flush_loop():
+    """Checkpoint queued interactions to disk on a fixed interval"""
+    while True:
+        await asyncio.sleep(TICKETS_FLUSH_INTERVAL)
+        _prune_last_seen()
+        batch = _drain_interactions()
+        if batch:
+            # File I/O runs in a worker thread so it never blocks update handling
+            await asyncio.to_thread(_write_interactions, batch)
+
+async def post_init(application):
+    """Start the background ticket flusher once the bot is initialized"""
+    global _flush_task
+    _flush_task = asyncio.create_task(_flush_loop())
+
+def _close_tickets():
+    """Write out anything still in memory and close the ticket log"""
+    global _tickets_file
+    _write_interactions(_drain_interactions())
+    with _tickets_lock:
+        if _tickets_file is not None:
+            _tickets_file.close()
+            _tickets_file = None
+
+# Last-chance flush if the process exits without a clean PTB shutdown
+atexit.register(_close_tickets)
+
+async def post_shutdown(application):
+    """Stop the background flusher and write out anything still queued"""
+    if _flush_task:
+        _flush_task.cancel()
+    _close_tickets()
+
+# Per-user rate limiting (user_id -> monotonic time of last accepted command)
+RATE_LIMIT_SECONDS = 1.0
+_last_seen = {}
+
+def _prune_last_seen():
+    """Forget users whose rate-limit window has expired"""
+    cutoff = time.monotonic() - RATE_LIMIT_SECONDS
+    for user_id in [uid for uid, seen in _last_seen.items() if seen < cutoff]:
+        del _last_seen[user_id]
+
+# Fire-and-forget error replies still in flight
+MAX_BG_TASKS = 500
+_bg_tasks = set()
 
 # Optimized generic command handler
 async def handle_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -131,40 +256,60 @@ async def handle_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message or not update.message.text:
         return
     
-    # Extract command without the '/' prefix
-    cmd = update.message.text.split()[0][1:].lower()
+    # Extract command without the '/' prefix; a '/cmd@BotName' command is
+    # only ours when the suffix names this bot (CommandHandler's old check)
+    head = update.message.text.split(maxsplit=1)[0]
+    cmd, _, target = head[1:].partition('@')
+    if target and target.lower() != context.bot.username.lower():
+        return
+    if cmd not in COMMANDS:
+        cmd = cmd.lower()
     
-    # Get cached response
-    response = get_cached_response(cmd)
+    # Look up the pre-formatted response
+    response = RESPONSES.get(cmd)
     
     if response:
+        # Drop commands from users who are sending faster than the rate limit
+        user = update.effective_user
+        if user:
+            now = time.monotonic()
+            if now - _last_seen.get(user.id, float('-inf')) < RATE_LIMIT_SECONDS:
+                return
+            _last_seen[user.id] = now
+        
         try:
-            # Use reply_text with disable_web_page_preview for faster sending
+            # Use reply_text with disable_web_page_preview for faster sending;
+            # responses are plain text, so never apply a (default) parse mode
             await update.message.reply_text(
                 response, 
+                parse_mode=None,
                 disable_web_page_preview=True
             )
             
             # Log user interaction
-            user = update.effective_user
             log_user_interaction(user.id, user.username, cmd)
             
-            # Log with minimal overhead
-            if logger.isEnabledFor(logging.INFO):
-                logger.info(f"Command /{cmd} executed by user {user.id}")
+            # Deferred %-formatting only runs if the record is emitted
+            logger.info("Command /%s executed by user %s", cmd, user.id)
         except Exception as e:
-            if logger.isEnabledFor(logging.ERROR):
-                logger.error(f"Error in /{cmd} command: {e}")
-            # Send error response without awaiting if possible
-            asyncio.create_task(
+            logger.error("Error in /%s command: %s", cmd, e)
+            # Shed load instead of piling up error replies under a burst
+            if len(_bg_tasks) >= MAX_BG_TASKS:
+                logger.warning("Dropping error reply: %s replies already pending", len(_bg_tasks))
+                return
+            
+            # Send error response without awaiting, keeping a strong reference
+            # so the task is not garbage collected before it finishes
+            task = asyncio.create_task(
                 update.message.reply_text("Sorry, something went wrong. Please try again.")
             )
+            _bg_tasks.add(task)
+            task.add_done_callback(_bg_tasks.discard)
 
 # Optimized error handler
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
     """Handle errors with minimal logging overhead"""
-    if logger.isEnabledFor(logging.WARNING):
-        logger.warning(f'Update {update} caused error {context.error}')
+    logger.warning("Update %s caused error %s", update, context.error)
 
 def main():
     """Main function with optimized bot initialization"""
@@ -172,30 +317,44 @@ def main():
     app = (
         ApplicationBuilder()
         .token(BOT_TOKEN)
-        .concurrent_updates(True)  # Enable concurrent update processing
+        .concurrent_updates(256)  # Process up to 256 updates concurrently
+        # Size the request pool to match so handlers don't queue for a socket
+        .connection_pool_size(256)
+        .pool_timeout(5.0)
+        .connect_timeout(5.0)
+        .read_timeout(20.0)
+        .get_updates_connection_pool_size(1)  # Single long-poll connection
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
         .build()
     )
     
     # Add error handler
     app.add_error_handler(error_handler)
     
-    # Register a single command handler for all commands
-    commands = [
-        "start", "courses", "quiz", "survey", "help", 
-        "contact", "news", "scholarships", "register", "donate"
-    ]
-    
-    # Use a single handler instance for all commands
-    for cmd in commands:
-        app.add_handler(CommandHandler(cmd, handle_command))
+    # Register a single handler for all commands; RESPONSES picks the reply.
+    # block=False lets a slow reply in one chat run alongside other updates
+    app.add_handler(MessageHandler(filters.COMMAND, handle_command, block=False))
     
     # Start the bot with optimized settings
     logger.info("🤖 Atenu Help Bot is starting with log rotation...")
     logger.info("📁 Log files: 5MB max, 3 backups")
-    app.run_polling(
-        drop_pending_updates=True,  # Skip old updates for faster startup
-        allowed_updates=Update.MESSAGE  # Only process message updates
-    )
+    if WEBHOOK_URL:
+        # Telegram pushes updates to us; no getUpdates round-trips
+        logger.info("🌐 Receiving updates via webhook on port %s", WEBHOOK_PORT)
+        app.run_webhook(
+            listen="0.0.0.0",
+            port=WEBHOOK_PORT,
+            secret_token=WH_SECRET,
+            webhook_url=WEBHOOK_URL,
+            drop_pending_updates=True,
+            allowed_updates=[Update.MESSAGE]
+        )
+    else:
+        app.run_polling(
+            drop_pending_updates=True,  # Skip old updates for faster startup
+            allowed_updates=[Update.MESSAGE]  # Only process message updates
+        )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
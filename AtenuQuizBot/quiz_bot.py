@@ -1,13 +1,19 @@
 import logging
-import json
 import asyncio
 import random
+import re
 import sys
 import os
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional, List, Tuple
-from collections import defaultdict
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update, User
+from functools import lru_cache
+from pathlib import Path
+from collections import defaultdict, deque
+from collections.abc import Sequence
+import orjson
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.error import RetryAfter
 from telegram.ext import (
     Application, 
     CallbackQueryHandler, 
@@ -56,20 +62,177 @@ def setup_logging():
     
     return logging.getLogger(__name__)
 
-# Setup logging
-logger = setup_logging()
+# Module logger; handlers are attached by setup_logging() when the bot runs
+logger = logging.getLogger(__name__)
 
 # Configuration
 QUIZ_INTERVAL_MINUTES = 120  # Post every 120 minutes (2 hours)
 MESSAGE_DELETE_DELAY = 30  # seconds
+SEND_CONCURRENCY = 4  # Max concurrent quiz message sends
+DELETE_SWEEP_INTERVAL = 2  # seconds between batched message deletions
+DELETE_BATCH_SIZE = 100  # deleteMessages accepts at most 100 IDs per call
+DB_READ_CONNECTIONS = 4  # read connections next to the single database writer
+
+_MEDALS = ("🥇", "🥈", "🥉")  # Leaderboard medals for the top 3
+COMPACT_CALLBACK_DATA = True  # Emit a:<hex_id>:<option> / e:<hex_id> instead of the legacy format
+EXPLAIN_LABEL = "📝 Show Explanation"
+
+# Callback data formats. The legacy answer_<id>_<option> / explanation_<id>
+# patterns are still parsed so keyboards already posted keep working.
+_ANSWER_RE = re.compile(r'^a:([0-9a-f]+):([0-3])$')
+_EXPLANATION_RE = re.compile(r'^e:([0-9a-f]+)$')
+_LEGACY_ANSWER_RE = re.compile(r'^answer_(\d+)_([0-3])$')
+_LEGACY_EXPLANATION_RE = re.compile(r'^explanation_(\d+)$')
+
+def answer_callback_data(question_id: int, option: int) -> str:
+    """Build the callback data for an answer button"""
+    if COMPACT_CALLBACK_DATA:
+        return f"a:{question_id:x}:{option}"
+    return f"answer_{question_id}_{option}"
+
+def explanation_callback_data(question_id: int) -> str:
+    """Build the callback data for a 'Show Explanation' button"""
+    if COMPACT_CALLBACK_DATA:
+        return f"e:{question_id:x}"
+    return f"explanation_{question_id}"
+
+@lru_cache(maxsize=2048)
+def explanation_markup(question_id: int) -> InlineKeyboardMarkup:
+    """Return the (shared) 'Show Explanation' keyboard for a question"""
+    return InlineKeyboardMarkup.from_button(
+        InlineKeyboardButton(EXPLAIN_LABEL, callback_data=explanation_callback_data(question_id))
+    )
+
+def parse_answer_callback_data(data: str) -> tuple[int, int] | None:
+    """Return (question_id, option) from answer callback data, or None if malformed"""
+    match = _ANSWER_RE.match(data)
+    if match:
+        return int(match[1], 16), int(match[2])
+    match = _LEGACY_ANSWER_RE.match(data)
+    if match:
+        return int(match[1]), int(match[2])
+    return None
+
+def parse_explanation_callback_data(data: str) -> int | None:
+    """Return the question_id from explanation callback data, or None if malformed"""
+    match = _EXPLANATION_RE.match(data)
+    if match:
+        return int(match[1], 16)
+    match = _LEGACY_EXPLANATION_RE.match(data)
+    if match:
+        return int(match[1])
+    return None
+
+# Message templates, filled with str.format_map per command
+WELCOME_TEMPLATE = """
+🎯 Welcome to AtenuQuizBot, {first_name}!
+
+I automatically post quiz batches every {interval} minutes to help you practice.
+
+📚 **Commands:**
+• /quiz - Get current quiz manually
+• /stats - View your quiz statistics
+• /leaderboard - View current rankings
+• /start - Show this message
+
+📊 **Current Status:**
+• Total Batches: {total}
+• Batches Remaining: {remaining}
+• Random Order: Enabled
+• Database: SQLite ⚡
+• Anti-Abuse: Progressive Cooldown 🛡️
+
+🛡️ **Answer Limits:**
+• 1st attempt: Immediate
+• 2nd attempt: 1-hour cooldown
+• 3rd attempt: 6-hour cooldown
+• 4th+ attempts: 24-hour cooldown
+
+The next quiz will be posted automatically!
+"""
+
+STATS_TEMPLATE = """
+📊 **Your Quiz Statistics**
+
+🎯 **Overall Performance:**
+• Questions Answered: {total_questions_answered}
+• Correct Answers: {total_correct_answers}
+• Overall Accuracy: {overall_accuracy:.1f}%
+• Total Points: {total_points} 🏆
+
+📅 **Last Activity:** {last_activity}
+⚡ **Database**: SQLite
+🛡️ **Anti-Abuse**: Progressive Cooldown Active
+
+Use /leaderboard to see rankings!
+"""
+
+LEADERBOARD_TEMPLATE = """
+🏆 **LEADERBOARD** 🏆
+
+📅 **Today ({today}):**
+{daily}
+
+📊 **This Week:**
+{weekly}
+
+📈 **This Month:**
+{monthly}
+
+💡 **Scoring System:**
+• Correct Answer: +3 points (+2 correct + 1 participation)
+• Wrong Answer: -1 point (-2 wrong + 1 participation)
+• Minimum Points: 0 (no negative balance)
+
+🛡️ **Anti-Abuse System:**
+• Progressive cooldowns prevent spam (1h → 6h → 24h)
+• Fair competition for all participants
+
+⚡ **Database**: SQLite
+"""
+
+WEEKLY_ANNOUNCEMENT_TEMPLATE = """
+🎉 **WEEKLY LEADERBOARD RESULTS** 🎉
+
+📊 **Week of {week_start} - {week_end}**
+
+🏆 **Top Performers:**
+{top_users}
+
+Congratulations to all participants! 🎊
+
+Keep participating in our quizzes to climb the leaderboard!
+Next announcement: Next Sunday
+
+Use /leaderboard to see current rankings anytime!
+⚡ **Database**: SQLite
+🛡️ **Fair Play**: Anti-abuse system ensures fair competition
+"""
+
+MONTHLY_ANNOUNCEMENT_TEMPLATE = """
+🎉 **MONTHLY LEADERBOARD RESULTS** 🎉
+
+📊 **Month of {month_name}**
+
+🏆 **Top Performers:**
+{top_users}
+
+🌟 Congratulations to all participants! 🎊
+
+Monthly leaderboard has been reset for the new month.
+Keep participating in our quizzes!
+
+Use /leaderboard to see current rankings anytime!
+⚡ **Database**: SQLite
+🛡️ **Fair Play**: Anti-abuse system ensures fair competition
+"""
 
 # Load configuration from JSON file
+@lru_cache(maxsize=1)
 def load_config():
-    """Load bot configuration from JSON file"""
+    """Load bot configuration from JSON file (parsed once per process)"""
     try:
-        with open('configs/tokens.json', 'r') as f:
-            config = json.load(f)
-        return config
+        return orjson.loads(Path('configs/tokens.json').read_bytes())
     except FileNotFoundError:
         logger.error("Config file not found. Please create configs/tokens.json")
         return {}
@@ -78,12 +241,11 @@ def load_config():
         return {}
 
 # Load quiz data from JSON file (questions stay in JSON)
+@lru_cache(maxsize=1)
 def load_quiz_data():
-    """Load quiz data from JSON file"""
+    """Load quiz data from JSON file (parsed once per process)"""
     try:
-        with open('configs/quizzes.json', 'r') as f:
-            data = json.load(f)
-        return data['quiz_batches']
+        return orjson.loads(Path('configs/quizzes.json').read_bytes())['quiz_batches']
     except FileNotFoundError:
         logger.error("Quiz data file not found. Please create configs/quizzes.json")
         return []
@@ -94,23 +256,48 @@ def load_quiz_data():
 # Bot configuration
 CONFIG = load_config()
 BOT_TOKEN = CONFIG.get('quiz_bot_token')
-TARGET_CHATS = CONFIG.get('target_chats', [-1002478514549, -1002763968200])  # Fallback to original chats
-
-if not BOT_TOKEN:
-    logger.error("Bot token not found. Exiting.")
-    exit(1)
+# Ordered, de-duplicated tuple for sending; frozenset for O(1) membership checks
+TARGET_CHATS_TUPLE = tuple(dict.fromkeys(CONFIG.get('target_chats', [-1002478514549, -1002763968200])))  # Fallback to original chats
+TARGET_CHATS = frozenset(TARGET_CHATS_TUPLE)
+
+def _now_utc() -> datetime:
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+def _format_periods(now: datetime) -> tuple[str, str, str]:
+    """Return the (daily, weekly, monthly) leaderboard period keys for a moment in time"""
+    return now.strftime('%Y-%m-%d'), now.strftime('%Y-W%U'), now.strftime('%Y-%m')
+
+@dataclass(frozen=True, slots=True)
+class _Schedule:
+    """First run times for the bot's scheduled jobs"""
+    first_quiz: datetime
+    first_weekly: datetime
+    first_monthly: datetime
+    first_cleanup: datetime
 
 class AtenuQuizBot:
     """Atenu Quiz Bot with Database Backend"""
     
     def __init__(self, token: str):
+        if not token:
+            raise RuntimeError("Bot token not found. Add quiz_bot_token to configs/tokens.json")
+        
         self.token = token
         self.quiz_data = load_quiz_data()
-        self.available_batches = list(range(len(self.quiz_data)))  # Track available batches
+        self._question_index = self._build_question_index(self.quiz_data)
+        self._batch_render_cache: dict[int, dict] = {}  # batch_id -> rendered messages
+        self.available_batches = self._shuffled_batches()  # Track available batches in random order
         self.current_batch_index = None  # Will be set randomly
-        
-        # Shuffle batches for random order
-        random.shuffle(self.available_batches)
+        self._cycle_lock = asyncio.Lock()  # Guards batch cycle refill + selection
+        self._send_semaphore = asyncio.Semaphore(SEND_CONCURRENCY)  # Bounds in-flight sends
+        self._pending_deletes = defaultdict(deque)  # chat_id -> deque of (due_time, message_id)
+        self._callback_routes = {
+            'a': self.handle_answer,
+            'e': self.handle_explanation,
+            'answer': self.handle_answer,  # Legacy callback data
+            'explanation': self.handle_explanation
+        }
         
         # Build application
         self.application = (
@@ -121,6 +308,17 @@ class AtenuQuizBot:
         )
         self._setup_handlers()
 
+    def _shuffled_batches(self) -> deque:
+        """Return all batch indexes in a fresh random order"""
+        batches = list(range(len(self.quiz_data)))
+        random.shuffle(batches)
+        return deque(batches)
+
+    @staticmethod
+    def _build_question_index(quiz_data: list[dict]) -> dict[int, dict]:
+        """Map question ID to question for O(1) lookups in callbacks"""
+        return {q['id']: q for batch in quiz_data for q in batch['questions']}
+
     def _setup_handlers(self):
         """Setup all bot handlers"""
         self.application.add_handler(CommandHandler("start", self.start_command))
@@ -135,32 +333,12 @@ class AtenuQuizBot:
         user = update.effective_user
         logger.info(f"User {user.id} ({user.username}) started the quiz bot")
         
-        welcome_text = f"""
-🎯 Welcome to AtenuQuizBot, {user.first_name}!
-
-I automatically post quiz batches every {QUIZ_INTERVAL_MINUTES} minutes to help you practice.
-
-📚 **Commands:**
-• /quiz - Get current quiz manually
-• /stats - View your quiz statistics
-• /leaderboard - View current rankings
-• /start - Show this message
-
-📊 **Current Status:**
-• Total Batches: {len(self.quiz_data)}
-• Batches Remaining: {len(self.available_batches)}
-• Random Order: Enabled
-• Database: SQLite ⚡
-• Anti-Abuse: Progressive Cooldown 🛡️
-
-🛡️ **Answer Limits:**
-• 1st attempt: Immediate
-• 2nd attempt: 1-hour cooldown
-• 3rd attempt: 6-hour cooldown
-• 4th+ attempts: 24-hour cooldown
-
-The next quiz will be posted automatically!
-"""
+        welcome_text = WELCOME_TEMPLATE.format_map({
+            'first_name': user.first_name,
+            'interval': QUIZ_INTERVAL_MINUTES,
+            'total': len(self.quiz_data),
+            'remaining': len(self.available_batches)
+        })
         
         await update.message.reply_text(welcome_text)
 
@@ -182,7 +360,7 @@ The next quiz will be posted automatically!
         else:
             await update.message.reply_text("⏳ No quiz batch is currently active. Wait for the next scheduled quiz!")
 
-    async def send_quiz_batch(self, target_chats: List[int], context: ContextTypes.DEFAULT_TYPE):
+    async def send_quiz_batch(self, target_chats: Sequence[int], context: ContextTypes.DEFAULT_TYPE):
         """Send the current quiz batch to target chats"""
         try:
             if not self.quiz_data or self.current_batch_index is None or self.current_batch_index >= len(self.quiz_data):
@@ -190,18 +368,103 @@ The next quiz will be posted automatically!
                 return
             
             batch = self.quiz_data[self.current_batch_index]
+            render = self._get_batch_render(batch)
             
             # Calculate batch position in random sequence
             completed_batches = len(self.quiz_data) - len(self.available_batches)
             total_batches = len(self.quiz_data)
             
-            # Format header message
-            current_time = datetime.now().strftime('%H:%M')
-            header_text = f"""
-🎯 **Quiz Batch {completed_batches + 1}/{total_batches}** (Random Order)
-📚 **{batch['title']}**
+            # Fill in the dynamic parts of the cached header
+            header_text = render['header'].format(
+                position=completed_batches + 1,
+                total=total_batches,
+                time=_now_utc().astimezone().strftime('%H:%M')
+            )
+            
+            # Send to all target chats concurrently; one failing chat doesn't stop the others
+            await asyncio.gather(
+                *(self._send_batch_to_chat(chat_id, batch, header_text, render['questions'], context)
+                  for chat_id in target_chats),
+                return_exceptions=True
+            )
+            
+        except Exception as e:
+            logger.error(f"Critical error in send_quiz_batch: {e}")
+            # Reset current batch index to prevent blocking
+            self.current_batch_index = None
+
+    async def _send_message(self, context: ContextTypes.DEFAULT_TYPE, **kwargs):
+        """Send a message with bounded concurrency, honoring Telegram's RetryAfter once"""
+        try:
+            async with self._send_semaphore:
+                return await context.bot.send_message(**kwargs)
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if isinstance(retry_after, timedelta):
+                retry_after = retry_after.total_seconds()
+            logger.warning(f"Rate limited by Telegram, retrying in {retry_after}s")
+        
+        # Wait without holding a send slot so other chats' sends keep flowing
+        await asyncio.sleep(retry_after)
+        async with self._send_semaphore:
+            return await context.bot.send_message(**kwargs)
+
+    async def _send_batch_to_chat(self, chat_id: int, batch: dict, header_text: str,
+                                  rendered_questions: list[tuple[str, InlineKeyboardMarkup]],
+                                  context: ContextTypes.DEFAULT_TYPE):
+        """Send the batch header and questions to a single chat"""
+        try:
+            # Send header
+            await self._send_message(
+                context,
+                chat_id=chat_id,
+                text=header_text,
+                parse_mode='Markdown'
+            )
+            
+            # Send each question in order; pacing comes from the send semaphore
+            # and Telegram's RetryAfter rather than a fixed sleep
+            for question_text, reply_markup in rendered_questions:
+                await self._send_message(
+                    context,
+                    chat_id=chat_id,
+                    text=question_text,
+                    reply_markup=reply_markup,
+                    parse_mode='Markdown'
+                )
+            
+            logger.info(f"Successfully sent random quiz batch (ID: {batch['batch_id']}) to chat {chat_id}")
+            
+        except Exception as e:
+            logger.error(f"Failed to send quiz to chat {chat_id}: {e}")
 
-⏰ Time: {current_time}
+    async def _send_announcement(self, chat_id: int, text: str, label: str,
+                                 context: ContextTypes.DEFAULT_TYPE):
+        """Send a leaderboard announcement to a single chat"""
+        try:
+            await self._send_message(
+                context,
+                chat_id=chat_id,
+                text=text,
+                parse_mode='Markdown'
+            )
+            logger.info(f"Sent {label} leaderboard to chat {chat_id}")
+        except Exception as e:
+            logger.error(f"Failed to send {label} leaderboard to {chat_id}: {e}")
+
+    def _get_batch_render(self, batch: dict) -> dict:
+        """Return the cached header template and (text, keyboard) pairs for a batch"""
+        render = self._batch_render_cache.get(batch['batch_id'])
+        if render is not None:
+            return render
+        
+        # Escape braces in the title so it survives str.format
+        title = batch['title'].replace('{', '{{').replace('}', '}}')
+        header = f"""
+🎯 **Quiz Batch {{position}}/{{total}}** (Random Order)
+📚 **{title}**
+
+⏰ Time: {{time}}
 📊 Questions: {len(batch['questions'])}
 🎲 Batch ID: {batch['batch_id']}
 ⚡ Database: SQLite
@@ -210,20 +473,10 @@ The next quiz will be posted automatically!
 Answer each question by clicking the buttons below!
 **Note:** Multiple attempts have progressive cooldowns (1h → 6h → 24h)
 """
-            
-            # Send to all target chats
-            for chat_id in target_chats:
-                try:
-                    # Send header
-                    await context.bot.send_message(
-                        chat_id=chat_id,
-                        text=header_text,
-                        parse_mode='Markdown'
-                    )
-                    
-                    # Send each question
-                    for i, question in enumerate(batch['questions'], 1):
-                        question_text = f"""
+        
+        questions = []
+        for i, question in enumerate(batch['questions'], 1):
+            question_text = f"""
 ❓ **Question {i}:**
 {question['question'].replace('__________', '----------')}
 
@@ -235,48 +488,33 @@ D. {question['options'][3]}
 
 *Click your answer below:*
 """
-                        
-                        # Create answer keyboard
-                        keyboard = [
-                            [
-                                InlineKeyboardButton("A", callback_data=f"answer_{question['id']}_0"),
-                                InlineKeyboardButton("B", callback_data=f"answer_{question['id']}_1"),
-                                InlineKeyboardButton("C", callback_data=f"answer_{question['id']}_2"),
-                                InlineKeyboardButton("D", callback_data=f"answer_{question['id']}_3")
-                            ]
-                        ]
-                        reply_markup = InlineKeyboardMarkup(keyboard)
-                        
-                        await context.bot.send_message(
-                            chat_id=chat_id,
-                            text=question_text,
-                            reply_markup=reply_markup,
-                            parse_mode='Markdown'
-                        )
-                        
-                        # Small delay between questions
-                        await asyncio.sleep(0.5)
-                    
-                    logger.info(f"Successfully sent random quiz batch (ID: {batch['batch_id']}) to chat {chat_id}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to send quiz to chat {chat_id}: {e}")
-                    # Continue with other chats even if one fails
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Critical error in send_quiz_batch: {e}")
-            # Reset current batch index to prevent blocking
-            self.current_batch_index = None
+            
+            # Create answer keyboard
+            keyboard = [
+                [
+                    InlineKeyboardButton("A", callback_data=answer_callback_data(question['id'], 0)),
+                    InlineKeyboardButton("B", callback_data=answer_callback_data(question['id'], 1)),
+                    InlineKeyboardButton("C", callback_data=answer_callback_data(question['id'], 2)),
+                    InlineKeyboardButton("D", callback_data=answer_callback_data(question['id'], 3))
+                ]
+            ]
+            questions.append((question_text, InlineKeyboardMarkup(keyboard)))
+        
+        render = {'header': header, 'questions': questions}
+        self._batch_render_cache[batch['batch_id']] = render
+        return render
 
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle button callbacks"""
         query = update.callback_query
         
-        if query.data.startswith("answer_"):
-            await self.handle_answer(update, context)
-        elif query.data.startswith("explanation_"):
-            await self.handle_explanation(update, context)
+        # Dispatch on the callback prefix ('a' in 'a:c:0', or legacy 'answer' in 'answer_12_0')
+        prefix, sep, _ = query.data.partition(':')
+        if not sep:
+            prefix = query.data.partition('_')[0]
+        handler = self._callback_routes.get(prefix)
+        if handler:
+            await handler(update, context)
         else:
             # Handle unknown callback types
             await query.answer("❌ Unknown action!", show_alert=True)
@@ -288,9 +526,11 @@ D. {question['options'][3]}
         user_name = query.from_user.first_name or query.from_user.username or f"User_{user_id}"
         
         # Parse callback data
-        parts = query.data.split('_')
-        question_id = int(parts[1])
-        selected_option = int(parts[2])
+        parsed = parse_answer_callback_data(query.data)
+        if not parsed:
+            await query.answer("❌ Invalid answer data.", show_alert=True)
+            return
+        question_id, selected_option = parsed
         
         # CHECK COOLDOWN TO PREVENT ABUSE
         can_answer, cooldown_message = await db.check_answer_cooldown(user_id, question_id)
@@ -299,14 +539,7 @@ D. {question['options'][3]}
             return
         
         # Find the question
-        question = None
-        for batch in self.quiz_data:
-            for q in batch['questions']:
-                if q['id'] == question_id:
-                    question = q
-                    break
-            if question:
-                break
+        question = self._question_index.get(question_id)
         
         if not question:
             await query.answer("❌ Question not found.", show_alert=True)
@@ -318,9 +551,10 @@ D. {question['options'][3]}
         # Calculate points: +3 for correct (+2 correct + 1 participation), -1 for incorrect (-2 wrong + 1 participation)
         points = 3 if is_correct else -1
         
-        # Save to DATABASE
+        # Save to DATABASE; the cooldown is checked again inside the write so
+        # concurrent taps that all passed the check above record only once
         try:
-            await db.save_user_answer(
+            saved, cooldown_message = await db.save_user_answer(
                 user_id=user_id,
                 question_id=question_id,
                 selected=selected_option,
@@ -330,13 +564,17 @@ D. {question['options'][3]}
                 username=query.from_user.username,
                 first_name=query.from_user.first_name
             )
-            logger.info(f"💾 Database: Saved answer for {user_name} (ID: {user_id})")
         except Exception as e:
             logger.error(f"❌ Database error saving answer: {e}")
             # Fallback: Inform user of technical issue
             await query.answer("⚠️ Technical issue saving your answer. Please try again.", show_alert=True)
             return
         
+        if not saved:
+            await query.answer(cooldown_message, show_alert=True)
+            return
+        logger.info(f"💾 Database: Saved answer for {user_name} (ID: {user_id})")
+        
         # Answer the callback query (acknowledge button press)
         await query.answer(f"Answer recorded! {'+3' if is_correct else '-1'} points")
         
@@ -345,23 +583,23 @@ D. {question['options'][3]}
         correct_letter = chr(65 + question["correct_answer"])
         
         if is_correct:
-            result_text = f"✅ **{user_name}**, you selected {selected_letter} - **Correct!** (+3 points)"
+            verdict = f"✅ **{user_name}**, you selected {selected_letter} - **Correct!** (+3 points)"
         else:
-            result_text = f"❌ **{user_name}**, you selected {selected_letter} - **Incorrect!** (-1 point)\nThe correct answer is {correct_letter}."
-        
-        result_text += f"\n\n**Your Answer:** {question['options'][selected_option]}"
-        result_text += f"\n**Correct Answer:** {question['options'][question['correct_answer']]}"
+            verdict = f"❌ **{user_name}**, you selected {selected_letter} - **Incorrect!** (-1 point)\nThe correct answer is {correct_letter}."
         
-        # Add cooldown info for transparency
-        result_text += f"\n\n🛡️ **Anti-Abuse:** {cooldown_message}"
+        # Both answers, plus cooldown info for transparency
+        result_text = (
+            f"{verdict}\n\n"
+            f"**Your Answer:** {question['options'][selected_option]}\n"
+            f"**Correct Answer:** {question['options'][question['correct_answer']]}\n\n"
+            f"🛡️ **Anti-Abuse:** {cooldown_message}"
+        )
         
         # Add explanation button
-        keyboard = [[
-            InlineKeyboardButton("📝 Show Explanation", callback_data=f"explanation_{question_id}")
-        ]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = explanation_markup(question_id)
         
-        sent_message = await context.bot.send_message(
+        sent_message = await self._send_message(
+            context,
             chat_id=query.message.chat.id,
             text=result_text,
             reply_to_message_id=query.message.message_id,
@@ -370,29 +608,20 @@ D. {question['options'][3]}
         )
         
         # Schedule message deletion
-        context.job_queue.run_once(
-            self.delete_message,
-            when=MESSAGE_DELETE_DELAY,
-            data={'chat_id': query.message.chat.id, 'message_id': sent_message.message_id}
-        )
+        self._schedule_delete(query.message.chat.id, sent_message.message_id)
 
     async def handle_explanation(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show explanation for the question"""
         query = update.callback_query
         
         # Parse callback data
-        parts = query.data.split('_')
-        question_id = int(parts[1])
+        question_id = parse_explanation_callback_data(query.data)
+        if question_id is None:
+            await query.answer("❌ Invalid explanation data.", show_alert=True)
+            return
         
         # Find the question
-        question = None
-        for batch in self.quiz_data:
-            for q in batch['questions']:
-                if q['id'] == question_id:
-                    question = q
-                    break
-            if question:
-                break
+        question = self._question_index.get(question_id)
         
         if question:
             # Answer callback query
@@ -407,24 +636,35 @@ D. {question['options'][3]}
             )
             
             # Schedule message deletion
-            context.job_queue.run_once(
-                self.delete_message,
-                when=MESSAGE_DELETE_DELAY,
-                data={'chat_id': query.message.chat.id, 'message_id': query.message.message_id}
-            )
+            self._schedule_delete(query.message.chat.id, query.message.message_id)
         else:
             await query.answer("❌ Question not found.", show_alert=True)
 
-    async def delete_message(self, context: ContextTypes.DEFAULT_TYPE):
-        """Delete a message"""
-        try:
-            job_data = context.job.data
-            await context.bot.delete_message(
-                chat_id=job_data['chat_id'],
-                message_id=job_data['message_id']
-            )
-        except Exception:
-            pass  # Message might already be deleted
+    def _schedule_delete(self, chat_id: int, message_id: int):
+        """Queue a message for deletion after MESSAGE_DELETE_DELAY"""
+        self._pending_deletes[chat_id].append((time.monotonic() + MESSAGE_DELETE_DELAY, message_id))
+
+    async def flush_deletes(self, context: ContextTypes.DEFAULT_TYPE):
+        """Delete all messages that are due, batched per chat via deleteMessages"""
+        now = time.monotonic()
+        for chat_id in list(self._pending_deletes):
+            pending = self._pending_deletes[chat_id]
+            
+            # Entries share the same delay, so due messages are always at the front
+            due = []
+            while pending and pending[0][0] <= now:
+                due.append(pending.popleft()[1])
+            if not pending:
+                del self._pending_deletes[chat_id]
+            
+            for i in range(0, len(due), DELETE_BATCH_SIZE):
+                try:
+                    await context.bot.delete_messages(
+                        chat_id=chat_id,
+                        message_ids=due[i:i + DELETE_BATCH_SIZE]
+                    )
+                except Exception:
+                    pass  # Messages might already be deleted
 
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command - Database Version"""
@@ -438,21 +678,10 @@ D. {question['options'][3]}
                 await update.message.reply_text("📊 You haven't answered any questions yet!")
                 return
             
-            stats_text = f"""
-📊 **Your Quiz Statistics**
-
-🎯 **Overall Performance:**
-• Questions Answered: {user_stats['total_questions_answered']}
-• Correct Answers: {user_stats['total_correct_answers']}
-• Overall Accuracy: {user_stats['overall_accuracy']:.1f}%
-• Total Points: {user_stats['total_points']} 🏆
-
-📅 **Last Activity:** {user_stats['last_activity'][:19].replace('T', ' ')}
-⚡ **Database**: SQLite
-🛡️ **Anti-Abuse**: Progressive Cooldown Active
-
-Use /leaderboard to see rankings!
-"""
+            stats_text = STATS_TEMPLATE.format_map({
+                **user_stats,
+                'last_activity': user_stats['last_activity'][:19].replace('T', ' ')
+            })
             
             await update.message.reply_text(stats_text)
             
@@ -464,38 +693,18 @@ Use /leaderboard to see rankings!
         """Handle /leaderboard command - Database Version"""
         try:
             # Get leaderboards from DATABASE with error handling
-            current_time = datetime.now(timezone.utc)
-            today = current_time.strftime('%Y-%m-%d')
-            week = current_time.strftime('%Y-W%U')
-            month = current_time.strftime('%Y-%m')
+            today, week, month = _format_periods(_now_utc())
             
             daily_top = await db.get_leaderboard('daily', today, 5)
             weekly_top = await db.get_leaderboard('weekly', week, 5)
             monthly_top = await db.get_leaderboard('monthly', month, 5)
             
-            leaderboard_text = f"""
-🏆 **LEADERBOARD** 🏆
-
-📅 **Today ({today}):**
-{self.format_top_users(daily_top)}
-
-📊 **This Week:**
-{self.format_top_users(weekly_top)}
-
-📈 **This Month:**
-{self.format_top_users(monthly_top)}
-
-💡 **Scoring System:**
-• Correct Answer: +3 points (+2 correct + 1 participation)
-• Wrong Answer: -1 point (-2 wrong + 1 participation)
-• Minimum Points: 0 (no negative balance)
-
-🛡️ **Anti-Abuse System:**
-• Progressive cooldowns prevent spam (1h → 6h → 24h)
-• Fair competition for all participants
-
-⚡ **Database**: SQLite
-"""
+            leaderboard_text = LEADERBOARD_TEMPLATE.format_map({
+                'today': today,
+                'daily': self.format_top_users(daily_top),
+                'weekly': self.format_top_users(weekly_top),
+                'monthly': self.format_top_users(monthly_top)
+            })
             
             await update.message.reply_text(leaderboard_text)
             
@@ -503,35 +712,28 @@ Use /leaderboard to see rankings!
             logger.error(f"❌ Database error getting leaderboard: {e}")
             await update.message.reply_text("❌ Error retrieving leaderboard. Please try again.")
 
-    def format_top_users(self, top_users: List[Tuple[str, int, int, float]]) -> str:
+    def format_top_users(self, top_users: list[tuple[str, int, int, float]]) -> str:
         """Format top users for display"""
         if not top_users:
             return "🚫 No participants yet"
         
-        formatted = []
-        medals = ["🥇", "🥈", "🥉"]
-        
-        for i, (name, points, questions, accuracy) in enumerate(top_users):
-            if i < 3:  # Top 3 get medals
-                medal = medals[i]
-            else:  # Others get numbered position
-                medal = f"{i+1}."
-            
-            # Truncate long names
-            display_name = name[:15] + "..." if len(name) > 15 else name
-            formatted.append(f"{medal} {display_name}: {points} pts ({questions}Q, {accuracy:.0f}%)")
-        
-        return "\n".join(formatted)
+        # Top 3 get medals, others get numbered position; long names are truncated
+        return "\n".join(
+            f"{_MEDALS[i] if i < 3 else f'{i+1}.'} "
+            f"{name if len(name) <= 15 else name[:15] + '...'}: "
+            f"{points} pts ({questions}Q, {accuracy:.0f}%)"
+            for i, (name, points, questions, accuracy) in enumerate(top_users)
+        )
 
     async def weekly_leaderboard_announcement(self, context: ContextTypes.DEFAULT_TYPE):
         """Send weekly leaderboard announcement every Sunday"""
         try:
-            current_time = datetime.now(timezone.utc)
+            now = _now_utc()
             
             # Calculate last Monday (proper ISO week start)
-            days_since_monday = current_time.weekday()  # 0=Monday, 6=Sunday
-            last_monday = current_time - timedelta(days=days_since_monday + 7)
-            last_week = last_monday.strftime('%Y-W%U')
+            days_since_monday = now.weekday()  # 0=Monday, 6=Sunday
+            last_monday = now - timedelta(days=days_since_monday + 7)
+            _, last_week, _ = _format_periods(last_monday)
             
             # Get winners from DATABASE
             top_users = await db.get_leaderboard('weekly', last_week, 3)
@@ -544,35 +746,18 @@ Use /leaderboard to see rankings!
             week_start = last_monday.strftime('%B %d')
             week_end = (last_monday + timedelta(days=6)).strftime('%B %d, %Y')
             
-            announcement_text = f"""
-🎉 **WEEKLY LEADERBOARD RESULTS** 🎉
-
-📊 **Week of {week_start} - {week_end}**
-
-🏆 **Top Performers:**
-{self.format_top_users(top_users)}
-
-Congratulations to all participants! 🎊
-
-Keep participating in our quizzes to climb the leaderboard!
-Next announcement: Next Sunday
-
-Use /leaderboard to see current rankings anytime!
-⚡ **Database**: SQLite
-🛡️ **Fair Play**: Anti-abuse system ensures fair competition
-"""
-            
-            # Send to all target chats
-            for chat_id in TARGET_CHATS:
-                try:
-                    await context.bot.send_message(
-                        chat_id=chat_id,
-                        text=announcement_text,
-                        parse_mode='Markdown'
-                    )
-                    logger.info(f"Sent weekly leaderboard to chat {chat_id}")
-                except Exception as e:
-                    logger.error(f"Failed to send weekly leaderboard to {chat_id}: {e}")
+            announcement_text = WEEKLY_ANNOUNCEMENT_TEMPLATE.format_map({
+                'week_start': week_start,
+                'week_end': week_end,
+                'top_users': self.format_top_users(top_users)
+            })
+            
+            # Send to all target chats concurrently
+            await asyncio.gather(
+                *(self._send_announcement(chat_id, announcement_text, 'weekly', context)
+                  for chat_id in TARGET_CHATS_TUPLE),
+                return_exceptions=True
+            )
             
             logger.info("Weekly leaderboard announcement completed")
             
@@ -582,14 +767,10 @@ Use /leaderboard to see current rankings anytime!
     async def monthly_leaderboard_announcement(self, context: ContextTypes.DEFAULT_TYPE):
         """Send monthly leaderboard announcement on last day of month and clear data"""
         try:
-            current_time = datetime.now(timezone.utc)
-            # Get last month's data (proper month calculation)
-            if current_time.month == 1:
-                last_month_date = current_time.replace(year=current_time.year - 1, month=12)
-            else:
-                last_month_date = current_time.replace(month=current_time.month - 1)
-            
-            last_month = last_month_date.strftime('%Y-%m')
+            now = _now_utc()
+            # Get last month's data (step back from the 1st so short months can't overflow)
+            last_month_date = now.replace(day=1) - timedelta(days=1)
+            _, _, last_month = _format_periods(last_month_date)
             
             # Get winners from DATABASE
             top_users = await db.get_leaderboard('monthly', last_month, 3)
@@ -601,35 +782,17 @@ Use /leaderboard to see current rankings anytime!
                 return
             
             # Create announcement message
-            announcement_text = f"""
-🎉 **MONTHLY LEADERBOARD RESULTS** 🎉
-
-📊 **Month of {last_month_date.strftime('%B %Y')}**
-
-🏆 **Top Performers:**
-{self.format_top_users(top_users)}
-
-🌟 Congratulations to all participants! 🎊
-
-Monthly leaderboard has been reset for the new month.
-Keep participating in our quizzes!
-
-Use /leaderboard to see current rankings anytime!
-⚡ **Database**: SQLite
-🛡️ **Fair Play**: Anti-abuse system ensures fair competition
-"""
-            
-            # Send to all target chats
-            for chat_id in TARGET_CHATS:
-                try:
-                    await context.bot.send_message(
-                        chat_id=chat_id,
-                        text=announcement_text,
-                        parse_mode='Markdown'
-                    )
-                    logger.info(f"Sent monthly leaderboard to chat {chat_id}")
-                except Exception as e:
-                    logger.error(f"Failed to send monthly leaderboard to {chat_id}: {e}")
+            announcement_text = MONTHLY_ANNOUNCEMENT_TEMPLATE.format_map({
+                'month_name': last_month_date.strftime('%B %Y'),
+                'top_users': self.format_top_users(top_users)
+            })
+            
+            # Send to all target chats concurrently
+            await asyncio.gather(
+                *(self._send_announcement(chat_id, announcement_text, 'monthly', context)
+                  for chat_id in TARGET_CHATS_TUPLE),
+                return_exceptions=True
+            )
             
             # Clear monthly leaderboard data after announcement
             await db.clear_monthly_leaderboard()
@@ -645,19 +808,19 @@ Use /leaderboard to see current rankings anytime!
                 logger.error("No quiz data available")
                 return
             
-            # Check if we have available batches
-            if not self.available_batches:
-                # All batches completed, start new random cycle
-                logger.info("All quiz batches completed! Starting new random cycle.")
-                self.available_batches = list(range(len(self.quiz_data)))
-                random.shuffle(self.available_batches)
-            
-            # Get next random batch
-            self.current_batch_index = self.available_batches.pop(0)
+            async with self._cycle_lock:
+                # Check if we have available batches
+                if not self.available_batches:
+                    # All batches completed, start new random cycle
+                    logger.info("All quiz batches completed! Starting new random cycle.")
+                    self.available_batches = self._shuffled_batches()
+                
+                # Get next random batch
+                self.current_batch_index = self.available_batches.popleft()
             current_batch = self.quiz_data[self.current_batch_index]
             
             # Send current batch
-            await self.send_quiz_batch(TARGET_CHATS, context)
+            await self.send_quiz_batch(TARGET_CHATS_TUPLE, context)
             
             remaining_batches = len(self.available_batches)
             completed_batches = len(self.quiz_data) - remaining_batches
@@ -672,17 +835,76 @@ Use /leaderboard to see current rankings anytime!
         """Weekly cleanup of old answers (runs every Sunday at 2 AM)"""
         try:
             await db.cleanup_old_answers()
+            await db.weekly_maintenance()
             logger.info("Weekly cleanup completed - removed answers older than 30 days")
         except Exception as e:
             logger.error(f"Error in weekly cleanup: {e}")
 
+    @staticmethod
+    def _compute_schedule(now_utc: datetime) -> "_Schedule":
+        """Compute the first run time of every scheduled job from one timestamp"""
+        # Wall-clock schedules use the server's local time, kept timezone-aware
+        # so the JobQueue doesn't reinterpret them as UTC
+        now = now_utc.astimezone()
+        
+        first_quiz = now_utc + timedelta(minutes=QUIZ_INTERVAL_MINUTES + 0.17)
+        
+        # Weekly leaderboard announcement every Sunday at 9:00 AM
+        days_until_sunday = (6 - now.weekday()) % 7  # 0 = Monday, 6 = Sunday
+        if days_until_sunday == 0 and now.hour >= 9:  # If it's Sunday and past 9 AM
+            days_until_sunday = 7  # Schedule for next Sunday
+        first_weekly = now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=days_until_sunday)
+        
+        # Weekly cleanup every Sunday at 2:00 AM
+        days_until_sunday_cleanup = (6 - now.weekday()) % 7
+        if days_until_sunday_cleanup == 0 and now.hour >= 2:
+            days_until_sunday_cleanup = 7
+        first_cleanup = now.replace(hour=2, minute=0, second=0, microsecond=0) + timedelta(days=days_until_sunday_cleanup)
+        
+        # Monthly leaderboard announcement on last day of each month at 11:00 PM
+        if now.month == 12:
+            next_month = now.replace(year=now.year + 1, month=1, day=1)
+        else:
+            next_month = now.replace(month=now.month + 1, day=1)
+        first_monthly = (next_month - timedelta(days=1)).replace(hour=23, minute=0, second=0, microsecond=0)
+        
+        # If we've already passed this month's last day, schedule for next month
+        if now > first_monthly:
+            if next_month.month == 12:
+                next_next_month = next_month.replace(year=next_month.year + 1, month=1, day=1)
+            else:
+                next_next_month = next_month.replace(month=next_month.month + 1, day=1)
+            first_monthly = (next_next_month - timedelta(days=1)).replace(hour=23, minute=0, second=0, microsecond=0)
+        
+        return _Schedule(
+            first_quiz=first_quiz,
+            first_weekly=first_weekly,
+            first_monthly=first_monthly,
+            first_cleanup=first_cleanup
+        )
+
     def run(self):
         """Start the bot with scheduling"""
+        setup_logging()
+        
         try:
             job_queue = self.application.job_queue
             if job_queue is None:
                 raise RuntimeError("JobQueue not available")
             
+            # Route read-only queries to their own connections
+            db.init_pool(readers=DB_READ_CONNECTIONS)
+            
+            # Sweep due message deletions in batches
+            job_queue.run_repeating(
+                self.flush_deletes,
+                interval=DELETE_SWEEP_INTERVAL,
+                first=DELETE_SWEEP_INTERVAL
+            )
+            
+            # Compute every first-run time from a single clock read
+            sched = self._compute_schedule(_now_utc())
+            
             # Send first batch immediately (after 10 seconds)
             job_queue.run_once(
                 self.scheduled_quiz_sender,
@@ -693,64 +915,28 @@ Use /leaderboard to see current rankings anytime!
             job_queue.run_repeating(
                 self.scheduled_quiz_sender,
                 interval=timedelta(minutes=QUIZ_INTERVAL_MINUTES),
-                first=timedelta(minutes=QUIZ_INTERVAL_MINUTES + 0.17)  # Start regular schedule after first quiz
+                first=sched.first_quiz  # Start regular schedule after first quiz
             )
             
             # Schedule weekly leaderboard announcement every Sunday at 9:00 AM
-            now = datetime.now()
-            days_until_sunday = (6 - now.weekday()) % 7  # 0 = Monday, 6 = Sunday
-            if days_until_sunday == 0 and now.hour >= 9:  # If it's Sunday and past 9 AM
-                days_until_sunday = 7  # Schedule for next Sunday
-            
-            next_sunday = now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=days_until_sunday)
-            
             job_queue.run_repeating(
                 self.weekly_leaderboard_announcement,
                 interval=timedelta(weeks=1),
-                first=next_sunday
+                first=sched.first_weekly
             )
             
-            # Schedule monthly leaderboard announcement on last day of each month at 11:00 PM
-            if now.month == 12:
-                next_month = now.replace(year=now.year + 1, month=1, day=1)
-            else:
-                next_month = now.replace(month=now.month + 1, day=1)
-            
-            # Last day of current month
-            last_day_current_month = next_month - timedelta(days=1)
-            last_day_announcement_time = last_day_current_month.replace(hour=23, minute=0, second=0, microsecond=0)
-            
-            # If we've already passed this month's last day, schedule for next month
-            if now > last_day_announcement_time:
-                if next_month.month == 12:
-                    next_next_month = next_month.replace(year=next_month.year + 1, month=1, day=1)
-                else:
-                    next_next_month = next_month.replace(month=next_month.month + 1, day=1)
-                last_day_announcement_time = (next_next_month - timedelta(days=1)).replace(hour=23, minute=0, second=0, microsecond=0)
-            
             # Schedule weekly cleanup (every Sunday at 2:00 AM)
-            cleanup_time = now.replace(hour=2, minute=0, second=0, microsecond=0)
-            if now > cleanup_time:
-                cleanup_time += timedelta(days=1)  # Next day if already passed
-            
-            # Find next Sunday for cleanup
-            days_until_sunday_cleanup = (6 - now.weekday()) % 7
-            if days_until_sunday_cleanup == 0 and now.hour >= 2:
-                days_until_sunday_cleanup = 7
-            
-            next_cleanup = cleanup_time + timedelta(days=days_until_sunday_cleanup)
-            
             job_queue.run_repeating(
                 self.weekly_cleanup,
                 interval=timedelta(weeks=1),
-                first=next_cleanup
+                first=sched.first_cleanup
             )
             
             # Schedule monthly announcements
             job_queue.run_repeating(
                 self.monthly_leaderboard_announcement,
                 interval=timedelta(days=30),  # Approximate interval, will auto-adjust
-                first=last_day_announcement_time
+                first=sched.first_monthly
             )
             
             logger.info(f"🤖 Atenu Quiz Bot started with SQLite Database!")
@@ -760,7 +946,7 @@ Use /leaderboard to see current rankings anytime!
             logger.info(f"📅 Monthly leaderboard: Last day of each month at 11:00 PM (with data clearing)")
             logger.info(f"🛡️ ANTI-ABUSE SYSTEM: Progressive cooldown enabled (1h → 6h → 24h)")
             logger.info(f"🧹 Weekly cleanup: Old answers deleted every Sunday at 2:00 AM")
-            logger.info(f"🎯 Target chats: {TARGET_CHATS}")
+            logger.info(f"🎯 Target chats: {list(TARGET_CHATS_TUPLE)}")
             logger.info(f"⚡ Database: SQLite at database/atenu_quiz.db")
             
             # Run with optimized settings
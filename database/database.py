@@ -4,18 +4,113 @@ Handles all database interactions using SQLAlchemy with SQLite
 """
 
 import os
+import asyncio
 import logging
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
-from sqlalchemy import create_engine, and_, desc, func
+import orjson
+from sqlalchemy import bindparam, create_engine, event, desc, exists, func, lambda_stmt, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 
-from models import Base, User, UserAnswer, LeaderboardEntry, HelpTicket
+from models import (
+    Base, User, UserAnswer, LeaderboardEntry, HelpTicket, PERIOD_MONTHLY, PERIOD_TYPES
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Per-connection tuning: WAL so readers don't block on the writer, fewer fsyncs,
+# in-memory temp tables, a 256MB mmap window and a ~64MB page cache
+_SQLITE_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-64000;
+PRAGMA foreign_keys=ON;
+"""
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the SQLite tuning pragmas to every new connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.executescript(_SQLITE_PRAGMAS)
+    cursor.close()
+
+# Progressive answer cooldown, indexed by previous attempts - 1: (wait, next wait)
+_COOLDOWNS = (
+    (timedelta(hours=1), "6 hours"),
+    (timedelta(hours=6), "24 hours"),
+    (timedelta(hours=24), "24 hours"),
+)
+
+def _period_keys(moment: datetime) -> Dict[str, str]:
+    """Leaderboard period keys, matching strftime('%Y-%m-%d' / '%Y-W%U' / '%Y-%m')
+    
+    Built with integer formatting; %U counts Sunday-started weeks, with the
+    days before the year's first Sunday in week 00.
+    """
+    year, month, day = moment.year, moment.month, moment.day
+    year_day = moment.toordinal() - datetime(year, 1, 1).toordinal()
+    week = (year_day + 7 - (moment.weekday() + 1) % 7) // 7
+    daily = f"{year:04d}-{month:02d}-{day:02d}"
+    return {
+        'daily': daily,
+        'weekly': f"{year:04d}-W{week:02d}",
+        'monthly': daily[:7]
+    }
+
+# Hot queries as lambda statements: built and compiled once, cached by SQLAlchemy,
+# then only the bound parameters change per call
+_USER_BY_ID = lambda_stmt(lambda: select(User).where(User.user_id == bindparam('user_id')))
+_ANSWER_EXISTS = lambda_stmt(
+    lambda: select(exists().where(
+        UserAnswer.user_id == bindparam('user_id'),
+        UserAnswer.question_id == bindparam('question_id')
+    ))
+)
+_LAST_ATTEMPT = lambda_stmt(
+    lambda: select(UserAnswer.attempt_number, UserAnswer.timestamp).where(
+        UserAnswer.user_id == bindparam('user_id'),
+        UserAnswer.question_id == bindparam('question_id')
+    ).order_by(desc(UserAnswer.attempt_number)).limit(1)
+)
+_LEADERBOARD = lambda_stmt(
+    lambda: select(LeaderboardEntry, User.first_name, User.username).join(
+        User, LeaderboardEntry.user_id == User.user_id
+    ).where(
+        LeaderboardEntry.period_type == bindparam('period_type'),
+        LeaderboardEntry.period_key == bindparam('period_key')
+    ).order_by(
+        desc(LeaderboardEntry.points),
+        desc(LeaderboardEntry.correct_answers)
+    ).limit(bindparam('limit'))
+)
+
+LEADERBOARD_CACHE_SIZE = 256  # get_leaderboard results kept per (period_type, period_key, limit)
+
+def _evaluate_cooldown(last_attempt) -> Tuple[bool, str]:
+    """Apply the progressive cooldown to the latest (attempt_number, timestamp) row, or None"""
+    if last_attempt is None:
+        return True, "✅ First attempt"
+    
+    attempts, last_timestamp = last_attempt
+    
+    time_since_last = datetime.utcnow() - last_timestamp
+    
+    # Progressive cooldown: 1hr → 6hr → 24hr
+    cooldown, next_wait = _COOLDOWNS[min(attempts, len(_COOLDOWNS)) - 1]
+    
+    if time_since_last < cooldown:
+        remaining = cooldown - time_since_last
+        hours = int(remaining.total_seconds() // 3600)
+        minutes = int((remaining.total_seconds() % 3600) // 60)
+        return False, f"⏳ Wait {hours}h {minutes}m before retry #{attempts + 1} (next: {next_wait})"
+    
+    return True, f"✅ Retry #{attempts + 1} allowed (next wait: {next_wait})"
+
 class DatabaseManager:
     """Manages all database operations for the quiz bot"""
     
@@ -24,45 +119,148 @@ class DatabaseManager:
         # Ensure database directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
-        # Create SQLite database
+        # Create SQLite database with a single dedicated writer connection
         self.db_path = db_path
-        self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.engine = self._create_engine(pool_size=1)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine)
+        
+        # Reads share the writer until init_pool() opens dedicated read connections
+        self.read_engine = None
+        self.ReadSessionLocal = self.SessionLocal
         
-        # Create tables
+        # Leaderboard results, valid while their period's version is unchanged
+        self._lb_cache = OrderedDict()
+        self._lb_version = defaultdict(int)
+        
+        # Create tables, and columns/indexes added after the tables already existed
         Base.metadata.create_all(bind=self.engine)
+        self._upgrade_schema()
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
         logger.info(f"Database initialized at {db_path}")
     
+    def _upgrade_schema(self) -> None:
+        """Bring a database file created by an older version up to the current schema"""
+        with self.engine.begin() as conn:
+            columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(user_answers)")}
+            if 'attempt_number' not in columns:
+                conn.exec_driver_sql(
+                    "ALTER TABLE user_answers ADD COLUMN attempt_number INTEGER NOT NULL DEFAULT 1"
+                )
+                # Number existing answers per (user, question) in insertion order,
+                # in one pass over the table
+                conn.exec_driver_sql("""
+                    UPDATE user_answers SET attempt_number = numbered.attempt_number
+                    FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY user_id, question_id ORDER BY id
+                        ) AS attempt_number
+                        FROM user_answers
+                    ) AS numbered
+                    WHERE user_answers.id = numbered.id
+                """)
+                logger.info("Added attempt_number to user_answers")
+            
+            # uq_ua_user_q_attempt covers the lookups this index served
+            conn.exec_driver_sql("DROP INDEX IF EXISTS ix_ua_user_q_ts")
+            
+            # uq_lb_user_period needs one entry per user and period: keep the oldest
+            # row of any duplicates, then drop the index it replaces
+            duplicates = conn.exec_driver_sql("""
+                DELETE FROM leaderboard_entries WHERE id NOT IN (
+                    SELECT MIN(id) FROM leaderboard_entries
+                    GROUP BY user_id, period_type, period_key
+                )
+            """).rowcount
+            if duplicates:
+                logger.warning(f"Removed {duplicates} duplicate leaderboard entries")
+            conn.exec_driver_sql("DROP INDEX IF EXISTS ix_lb_period_user")
+            
+            # period_type used to be stored as 'daily'/'weekly'/'monthly' text; SQLite
+            # can't change a column type in place, so rebuild the table once
+            period_type_column = next(
+                row for row in conn.exec_driver_sql("PRAGMA table_info(leaderboard_entries)")
+                if row[1] == 'period_type'
+            )
+            if 'INT' not in period_type_column[2].upper():
+                conn.exec_driver_sql("DROP INDEX IF EXISTS uq_lb_user_period")
+                conn.exec_driver_sql("DROP INDEX IF EXISTS ix_lb_period_points")
+                conn.exec_driver_sql("ALTER TABLE leaderboard_entries RENAME TO leaderboard_entries_old")
+                LeaderboardEntry.__table__.create(conn)
+                conn.exec_driver_sql(f"""
+                    INSERT INTO leaderboard_entries
+                        (id, user_id, period_type, period_key, points, questions_answered, correct_answers)
+                    SELECT id, user_id,
+                           CASE period_type
+                               WHEN 'daily' THEN {PERIOD_TYPES['daily']}
+                               WHEN 'weekly' THEN {PERIOD_TYPES['weekly']}
+                               WHEN 'monthly' THEN {PERIOD_TYPES['monthly']}
+                           END,
+                           period_key, points, questions_answered, correct_answers
+                    FROM leaderboard_entries_old
+                    WHERE period_type IN ('daily', 'weekly', 'monthly')
+                      AND user_id IN (SELECT user_id FROM users)
+                """)
+                
+                # Foreign keys are enforced, so entries without a user row (the old
+                # JSON migration didn't check) can't be copied; report what was left
+                unknown_periods, orphaned = conn.exec_driver_sql("""
+                    SELECT
+                        SUM(period_type NOT IN ('daily', 'weekly', 'monthly')),
+                        SUM(period_type IN ('daily', 'weekly', 'monthly')
+                            AND user_id NOT IN (SELECT user_id FROM users))
+                    FROM leaderboard_entries_old
+                """).one()
+                if unknown_periods:
+                    logger.warning(f"Dropped {unknown_periods} leaderboard entries with an unknown period_type")
+                if orphaned:
+                    logger.warning(f"Dropped {orphaned} leaderboard entries without a matching user")
+                conn.exec_driver_sql("DROP TABLE leaderboard_entries_old")
+                logger.info("Converted leaderboard_entries.period_type to integers")
+    
+    def _create_engine(self, pool_size: int):
+        """Create an engine with a fixed-size connection pool"""
+        engine = create_engine(
+            f'sqlite:///{self.db_path}',
+            echo=False,
+            # timeout is sqlite3's busy timeout: wait up to 30s for a lock
+            connect_args={"check_same_thread": False, "timeout": 30},
+            pool_size=pool_size,
+            max_overflow=0
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+    
+    def init_pool(self, readers: int = 4) -> None:
+        """Open a pool of read connections next to the single writer"""
+        if self.read_engine is not None:
+            return
+        
+        self.read_engine = self._create_engine(pool_size=readers)
+        self.ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=self.read_engine)
+        logger.info(f"Database pool ready: 1 writer, {readers} readers")
+    
     def get_session(self) -> Session:
-        """Get a database session"""
+        """Get a database session (writer connection)"""
         return self.SessionLocal()
     
+    def get_read_session(self) -> Session:
+        """Get a database session for read-only queries"""
+        return self.ReadSessionLocal()
+    
     # User Management
     async def get_or_create_user(self, user_id: int, username: str = None, first_name: str = None) -> User:
         """Get existing user or create new one"""
+        return await asyncio.to_thread(self._get_or_create_user_committed, user_id, username, first_name)
+    
+    def _get_or_create_user_committed(self, user_id: int, username: str = None,
+                                      first_name: str = None) -> User:
+        """Get or create the user in a session of its own and commit"""
         session = self.get_session()
         try:
-            user = session.query(User).filter(User.user_id == user_id).first()
-            
-            if not user:
-                user = User(
-                    user_id=user_id,
-                    username=username or '',
-                    first_name=first_name or '',
-                    registration_date=datetime.utcnow()
-                )
-                session.add(user)
-                session.commit()
-                logger.info(f"Created new user: {first_name} (ID: {user_id})")
-            else:
-                # Update user info if provided
-                if username:
-                    user.username = username
-                if first_name:
-                    user.first_name = first_name
-                session.commit()
-            
-            session.refresh(user)
+            user = self._get_or_create_user(session, user_id, username, first_name)
+            session.commit()
             return user
         except SQLAlchemyError as e:
             session.rollback()
@@ -71,14 +269,97 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def _get_or_create_user(self, session: Session, user_id: int, username: str = None,
+                            first_name: str = None) -> User:
+        """Load or add the user row inside an open session"""
+        user = session.execute(_USER_BY_ID, {'user_id': user_id}).scalar_one_or_none()
+        
+        if not user:
+            user = User(
+                user_id=user_id,
+                username=username or '',
+                first_name=first_name or '',
+                total_questions_answered=0,
+                total_correct_answers=0,
+                total_points=0,
+                registration_date=datetime.utcnow()
+            )
+            session.add(user)
+            session.flush()
+            logger.info(f"Created new user: {first_name} (ID: {user_id})")
+        else:
+            # Update user info if provided
+            if username:
+                user.username = username
+            if first_name:
+                user.first_name = first_name
+        
+        return user
+    
     async def save_user_answer(self, user_id: int, question_id: int, selected: int, 
                              correct_answer: int, is_correct: bool, points: int,
-                             username: str = None, first_name: str = None) -> None:
-        """Save user answer and update stats"""
+                             username: str = None, first_name: str = None) -> Tuple[bool, str]:
+        """Save user answer and update stats in a single transaction
+        
+        The cooldown is re-checked on the writer connection, so concurrent taps
+        can't both pass it. Returns (saved, cooldown_message); nothing is
+        written when saved is False.
+        """
+        saved, cooldown_message, touched_periods = await asyncio.to_thread(
+            self._save_user_answer, user_id, question_id, selected,
+            correct_answer, is_correct, points, username, first_name
+        )
+        
+        # Bump versions only once the new totals are visible to readers
+        for period in touched_periods:
+            self._lb_version[period] += 1
+        return saved, cooldown_message
+    
+    def _save_user_answer(self, user_id: int, question_id: int, selected: int,
+                          correct_answer: int, is_correct: bool, points: int,
+                          username: str = None, first_name: str = None) -> Tuple[bool, str, List[Tuple[str, str]]]:
+        """Write the answer, user stats and leaderboards; returns (saved, cooldown message, touched periods)"""
         session = self.get_session()
         try:
-            # Get or create user
-            user = await self.get_or_create_user(user_id, username, first_name)
+            # The session holds the single writer connection until it closes, so
+            # this check and the writes below can't interleave with another save
+            can_answer, cooldown_message = _evaluate_cooldown(session.execute(_LAST_ATTEMPT, {
+                'user_id': user_id,
+                'question_id': question_id
+            }).first())
+            if not can_answer:
+                return False, cooldown_message, []
+            
+            now = datetime.utcnow()
+            
+            # Create the user or bump their stats in one INSERT ... ON CONFLICT DO UPDATE;
+            # the SET expressions see the row's current values
+            columns = User.__table__.c
+            user_stmt = sqlite_insert(User).values(
+                user_id=user_id,
+                username=username or '',
+                first_name=first_name or '',
+                total_quizzes_taken=0,
+                total_questions_answered=1,
+                total_correct_answers=int(is_correct),
+                total_points=max(0, points),
+                last_activity=now,
+                registration_date=now
+            )
+            user_stmt = user_stmt.on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={
+                    # Only overwrite names when new ones were provided
+                    'username': func.coalesce(func.nullif(user_stmt.excluded.username, ''), columns.username),
+                    'first_name': func.coalesce(func.nullif(user_stmt.excluded.first_name, ''), columns.first_name),
+                    'total_questions_answered': columns.total_questions_answered + 1,
+                    'total_correct_answers': columns.total_correct_answers + int(is_correct),
+                    # No negative balance
+                    'total_points': func.max(0, columns.total_points + points),
+                    'last_activity': now
+                }
+            )
+            session.execute(user_stmt)
             
             # Save the answer
             answer = UserAnswer(
@@ -88,29 +369,23 @@ class DatabaseManager:
                 correct_answer=correct_answer,
                 is_correct=is_correct,
                 points=points,
-                timestamp=datetime.utcnow()
+                # Next attempt for this question, computed inside the INSERT
+                attempt_number=select(
+                    func.coalesce(func.max(UserAnswer.attempt_number), 0) + 1
+                ).where(
+                    UserAnswer.user_id == user_id,
+                    UserAnswer.question_id == question_id
+                ).scalar_subquery(),
+                timestamp=now
             )
             session.add(answer)
             
-            # Update user stats
-            user.total_questions_answered += 1
-            if is_correct:
-                user.total_correct_answers += 1
-            
-            # Update points (no negative balance)
-            user.total_points = max(0, user.total_points + points)
-            
-            # Update accuracy
-            if user.total_questions_answered > 0:
-                user.overall_accuracy = (user.total_correct_answers / user.total_questions_answered) * 100
-            
-            user.last_activity = datetime.utcnow()
-            
             # Update leaderboards
-            await self._update_leaderboards(session, user_id, points, is_correct)
+            touched_periods = self._update_leaderboards(session, user_id, points, is_correct)
             
             session.commit()
             logger.info(f"Saved answer for user {first_name} (ID: {user_id}) - Points: {points}")
+            return True, cooldown_message, touched_periods
             
         except SQLAlchemyError as e:
             session.rollback()
@@ -119,60 +394,68 @@ class DatabaseManager:
         finally:
             session.close()
     
-    async def _update_leaderboards(self, session: Session, user_id: int, points: int, is_correct: bool) -> None:
-        """Update leaderboard entries for daily, weekly, monthly"""
-        current_time = datetime.utcnow()
+    def _update_leaderboards(self, session: Session, user_id: int, points: int,
+                             is_correct: bool) -> List[Tuple[str, str]]:
+        """Upsert leaderboard entries for daily, weekly, monthly and return the touched periods"""
+        periods = _period_keys(datetime.utcnow())
         
-        periods = {
-            'daily': current_time.strftime('%Y-%m-%d'),
-            'weekly': current_time.strftime('%Y-W%U'),
-            'monthly': current_time.strftime('%Y-%m')
-        }
+        # One multi-row INSERT ... ON CONFLICT DO UPDATE for all three periods,
+        # keyed by uq_lb_user_period; every row gets the same delta
+        columns = LeaderboardEntry.__table__.c
+        stmt = sqlite_insert(LeaderboardEntry).values([
+            {
+                'user_id': user_id,
+                'period_type': PERIOD_TYPES[period_type],
+                'period_key': period_key,
+                'points': max(0, points),
+                'questions_answered': 1,
+                'correct_answers': int(is_correct)
+            }
+            for period_type, period_key in periods.items()
+        ]).on_conflict_do_update(
+            index_elements=['user_id', 'period_type', 'period_key'],
+            set_={
+                # No negative balance
+                'points': func.max(0, columns.points + points),
+                'questions_answered': columns.questions_answered + 1,
+                'correct_answers': columns.correct_answers + int(is_correct)
+            }
+        )
+        session.execute(stmt)
         
-        for period_type, period_key in periods.items():
-            # Get or create leaderboard entry
-            entry = session.query(LeaderboardEntry).filter(
-                and_(
-                    LeaderboardEntry.user_id == user_id,
-                    LeaderboardEntry.period_type == period_type,
-                    LeaderboardEntry.period_key == period_key
-                )
-            ).first()
-            
-            if not entry:
-                entry = LeaderboardEntry(
-                    user_id=user_id,
-                    period_type=period_type,
-                    period_key=period_key,
-                    points=0,
-                    questions_answered=0,
-                    correct_answers=0
-                )
-                session.add(entry)
-            
-            # Update entry
-            entry.points = max(0, entry.points + points)
-            entry.questions_answered += 1
-            if is_correct:
-                entry.correct_answers += 1
+        return list(periods.items())
     
     async def get_leaderboard(self, period_type: str, period_key: str, limit: int = 5) -> List[Tuple[str, int, int, float]]:
-        """Get leaderboard for specific period"""
-        session = self.get_session()
+        """Get leaderboard for specific period, served from cache until the period changes"""
+        cache_key = (period_type, period_key, limit)
+        version = self._lb_version[(period_type, period_key)]
+        cached = self._lb_cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            self._lb_cache.move_to_end(cache_key)
+            return list(cached[1])
+        
+        leaderboard = await asyncio.to_thread(self._query_leaderboard, period_type, period_key, limit)
+        if leaderboard is None:
+            return []
+        
+        self._lb_cache[cache_key] = (version, leaderboard)
+        self._lb_cache.move_to_end(cache_key)
+        if len(self._lb_cache) > LEADERBOARD_CACHE_SIZE:
+            self._lb_cache.popitem(last=False)
+        
+        return list(leaderboard)
+    
+    def _query_leaderboard(self, period_type: str, period_key: str,
+                           limit: int) -> Optional[List[Tuple[str, int, int, float]]]:
+        """Run the leaderboard query; None on database errors so failures aren't cached"""
+        session = self.get_read_session()
         try:
-            results = session.query(
-                LeaderboardEntry, User.first_name, User.username
-            ).join(
-                User, LeaderboardEntry.user_id == User.user_id
-            ).filter(
-                and_(
-                    LeaderboardEntry.period_type == period_type,
-                    LeaderboardEntry.period_key == period_key
-                )
-            ).order_by(
-                desc(LeaderboardEntry.points),
-                desc(LeaderboardEntry.correct_answers)
-            ).limit(limit).all()
+            results = session.execute(_LEADERBOARD, {
+                # Unknown period names bind NULL and match nothing
+                'period_type': PERIOD_TYPES.get(period_type),
+                'period_key': period_key,
+                'limit': limit
+            }).all()
             
             leaderboard = []
             for entry, first_name, username in results:
@@ -184,15 +467,18 @@ class DatabaseManager:
             
         except SQLAlchemyError as e:
             logger.error(f"Error getting leaderboard: {e}")
-            return []
+            return None
         finally:
             session.close()
     
     async def get_user_stats(self, user_id: int) -> Optional[Dict]:
         """Get user statistics"""
-        session = self.get_session()
+        return await asyncio.to_thread(self._get_user_stats, user_id)
+    
+    def _get_user_stats(self, user_id: int) -> Optional[Dict]:
+        session = self.get_read_session()
         try:
-            user = session.query(User).filter(User.user_id == user_id).first()
+            user = session.execute(_USER_BY_ID, {'user_id': user_id}).scalar_one_or_none()
             
             if not user:
                 return None
@@ -214,16 +500,15 @@ class DatabaseManager:
     
     async def check_user_answered_question(self, user_id: int, question_id: int) -> bool:
         """Check if user has already answered a specific question"""
-        session = self.get_session()
+        return await asyncio.to_thread(self._check_user_answered_question, user_id, question_id)
+    
+    def _check_user_answered_question(self, user_id: int, question_id: int) -> bool:
+        session = self.get_read_session()
         try:
-            answer = session.query(UserAnswer).filter(
-                and_(
-                    UserAnswer.user_id == user_id,
-                    UserAnswer.question_id == question_id
-                )
-            ).first()
-            
-            return answer is not None
+            return bool(session.execute(_ANSWER_EXISTS, {
+                'user_id': user_id,
+                'question_id': question_id
+            }).scalar())
             
         except SQLAlchemyError as e:
             logger.error(f"Error checking user answer: {e}")
@@ -233,47 +518,18 @@ class DatabaseManager:
     
     async def check_answer_cooldown(self, user_id: int, question_id: int) -> tuple:
         """Check if user can answer based on progressive cooldown"""
-        session = self.get_session()
+        return await asyncio.to_thread(self._check_answer_cooldown, user_id, question_id)
+    
+    def _check_answer_cooldown(self, user_id: int, question_id: int) -> tuple:
+        session = self.get_read_session()
         try:
-            # Count previous attempts
-            attempts = session.query(UserAnswer).filter(
-                and_(
-                    UserAnswer.user_id == user_id,
-                    UserAnswer.question_id == question_id
-                )
-            ).count()
-            
-            if attempts == 0:
-                return True, "✅ First attempt"
-            
-            # Get last attempt time
-            last_attempt = session.query(UserAnswer).filter(
-                and_(
-                    UserAnswer.user_id == user_id,
-                    UserAnswer.question_id == question_id
-                )
-            ).order_by(UserAnswer.timestamp.desc()).first()
-            
-            time_since_last = datetime.utcnow() - last_attempt.timestamp
+            # The latest attempt is a single seek on uq_ua_user_q_attempt
+            last_attempt = session.execute(_LAST_ATTEMPT, {
+                'user_id': user_id,
+                'question_id': question_id
+            }).first()
             
-            # Progressive cooldown: 1hr → 6hr → 24hr
-            if attempts == 1:
-                cooldown = timedelta(hours=1)
-                next_wait = "6 hours"
-            elif attempts == 2:
-                cooldown = timedelta(hours=6)
-                next_wait = "24 hours"
-            else:
-                cooldown = timedelta(hours=24)
-                next_wait = "24 hours"
-            
-            if time_since_last < cooldown:
-                remaining = cooldown - time_since_last
-                hours = int(remaining.total_seconds() // 3600)
-                minutes = int((remaining.total_seconds() % 3600) // 60)
-                return False, f"⏳ Wait {hours}h {minutes}m before retry #{attempts + 1} (next: {next_wait})"
-            
-            return True, f"✅ Retry #{attempts + 1} allowed (next wait: {next_wait})"
+            return _evaluate_cooldown(last_attempt)
             
         except SQLAlchemyError as e:
             logger.error(f"Error checking answer cooldown: {e}")
@@ -283,13 +539,23 @@ class DatabaseManager:
     
     async def clear_monthly_leaderboard(self) -> None:
         """Clear monthly leaderboard data"""
+        await asyncio.to_thread(self._clear_monthly_leaderboard)
+        
+        # Bump every monthly version so a query that was in flight during the
+        # clear can't re-cache the deleted rows, then drop the cached boards
+        for period in [period for period in self._lb_version if period[0] == 'monthly']:
+            self._lb_version[period] += 1
+        for cache_key in [key for key in self._lb_cache if key[0] == 'monthly']:
+            del self._lb_cache[cache_key]
+        logger.info("Monthly leaderboard data cleared")
+    
+    def _clear_monthly_leaderboard(self) -> None:
         session = self.get_session()
         try:
             session.query(LeaderboardEntry).filter(
-                LeaderboardEntry.period_type == 'monthly'
+                LeaderboardEntry.period_type == PERIOD_MONTHLY
             ).delete()
             session.commit()
-            logger.info("Monthly leaderboard data cleared")
             
         except SQLAlchemyError as e:
             session.rollback()
@@ -298,8 +564,71 @@ class DatabaseManager:
         finally:
             session.close()
     
+    async def cleanup_old_answers(self, days: int = 30) -> int:
+        """Delete answers older than the given number of days"""
+        return await asyncio.to_thread(self._cleanup_old_answers, days)
+    
+    def _cleanup_old_answers(self, days: int) -> int:
+        session = self.get_session()
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=days)
+            deleted = session.query(UserAnswer).filter(
+                UserAnswer.timestamp < cutoff
+            ).delete(synchronize_session=False)
+            session.commit()
+            logger.info(f"Deleted {deleted} answers older than {days} days")
+            return deleted
+            
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Error cleaning up old answers: {e}")
+            raise
+        finally:
+            session.close()
+    
+    async def weekly_maintenance(self) -> None:
+        """Fold the WAL back into the database file and refresh planner statistics"""
+        await asyncio.to_thread(self._weekly_maintenance)
+    
+    def _weekly_maintenance(self) -> None:
+        try:
+            with self.engine.connect() as conn:
+                busy, wal_pages, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").one()
+                conn.exec_driver_sql("PRAGMA optimize")
+            logger.info(f"WAL checkpoint: {checkpointed}/{wal_pages} pages (busy={busy}), optimize done")
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Error running database maintenance: {e}")
+    
+    def snapshot(self, path: str) -> None:
+        """Write a consistent copy of the live database to path with VACUUM INTO
+        
+        VACUUM INTO refuses to overwrite, so the copy is written to a temporary
+        file next to path and moved over any existing snapshot.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)  # Left over from an interrupted snapshot
+        
+        engine = self.read_engine or self.engine
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("VACUUM INTO ?", (tmp_path,))
+            os.replace(tmp_path, path)
+            logger.info(f"Database snapshot written to {path}")
+            
+        except (SQLAlchemyError, OSError) as e:
+            logger.error(f"Error writing database snapshot: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
     async def log_help_interaction(self, user_id: int, username: str, command: str) -> None:
         """Log help bot interaction"""
+        return await asyncio.to_thread(self._log_help_interaction, user_id, username, command)
+    
+    def _log_help_interaction(self, user_id: int, username: str, command: str) -> None:
         session = self.get_session()
         try:
             ticket = HelpTicket(
@@ -318,17 +647,28 @@ class DatabaseManager:
             session.close()
     
     def backup_to_json(self, backup_path: str = "data/backup") -> None:
-        """Backup database to JSON files (for compatibility)"""
-        import json
+        """Backup database to JSON files (for compatibility)
+        
+        Deprecated: use snapshot() for backups. This is kept only for tools
+        that still read the legacy JSON format. Users are streamed in chunks
+        and written one at a time, so memory stays flat however many rows
+        there are.
+        """
         os.makedirs(backup_path, exist_ok=True)
         
-        session = self.get_session()
+        session = self.get_read_session()
         try:
             # Backup users
-            users = session.query(User).all()
-            users_data = {
-                "users": {
-                    str(user.user_id): {
+            users = session.query(User).execution_options(stream_results=True).yield_per(1000)
+            
+            with open(f"{backup_path}/user_stats_backup.json", 'wb') as f:
+                f.write(b'{"users":{')
+                for i, user in enumerate(users):
+                    if i:
+                        f.write(b',')
+                    f.write(orjson.dumps(str(user.user_id)))
+                    f.write(b':')
+                    f.write(orjson.dumps({
                         "user_id": user.user_id,
                         "username": user.username or '',
                         "first_name": user.first_name or '',
@@ -338,13 +678,8 @@ class DatabaseManager:
                         "overall_accuracy": user.overall_accuracy,
                         "last_activity": user.last_activity.isoformat() if user.last_activity else '',
                         "registration_date": user.registration_date.isoformat() if user.registration_date else ''
-                    }
-                    for user in users
-                }
-            }
-            
-            with open(f"{backup_path}/user_stats_backup.json", 'w') as f:
-                json.dump(users_data, f, indent=2)
+                    }))
+                f.write(b'}}')
             
             logger.info(f"Database backed up to {backup_path}")
             
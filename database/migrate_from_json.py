@@ -7,12 +7,13 @@ import json
 import os
 import sys
 from datetime import datetime
+from sqlalchemy import insert, select, text
 from sqlalchemy.orm import Session
 
 # Add the parent directory to path to import models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.models import User, LeaderboardEntry, HelpTicket
+from database.models import User, LeaderboardEntry, HelpTicket, PERIOD_TYPES
 from database.database import DatabaseManager
 
 def migrate_user_stats():
@@ -24,6 +25,9 @@ def migrate_user_stats():
     session = db.get_session()
     
     try:
+        # One-shot bulk load: skip per-commit fsyncs on this connection only
+        session.execute(text("PRAGMA synchronous=OFF"))
+        
         # Load existing JSON data
         json_path = "data/user_stats.json"
         if not os.path.exists(json_path):
@@ -38,71 +42,75 @@ def migrate_user_stats():
         
         print(f"📊 Found {len(users_data)} users to migrate")
         
-        # Migrate users
-        migrated_users = 0
+        # Migrate users, skipping IDs already in the database
+        existing_users = set(session.scalars(select(User.user_id)))
+        user_rows = []
         for user_id_str, user_info in users_data.items():
             user_id = int(user_id_str)
             
-            # Check if user already exists
-            existing_user = session.query(User).filter(User.user_id == user_id).first()
-            if existing_user:
+            if user_id in existing_users:
                 print(f"⚠️  User {user_id} already exists, skipping...")
                 continue
             
-            # Create new user
-            user = User(
-                user_id=user_id,
-                username=user_info.get('username', ''),
-                first_name=user_info.get('first_name', ''),
-                total_quizzes_taken=user_info.get('total_quizzes_taken', 0),
-                total_questions_answered=user_info.get('total_questions_answered', 0),
-                total_correct_answers=user_info.get('total_correct_answers', 0),
-                total_points=user_info.get('total_points', 0),
-                overall_accuracy=user_info.get('overall_accuracy', 0.0),
-                last_activity=datetime.fromisoformat(user_info.get('last_activity', datetime.utcnow().isoformat())),
-                registration_date=datetime.fromisoformat(user_info.get('registration_date', datetime.utcnow().isoformat()))
-            )
-            
-            session.add(user)
-            migrated_users += 1
-            
-            if migrated_users % 100 == 0:
-                print(f"✅ Migrated {migrated_users} users...")
+            user_rows.append({
+                'user_id': user_id,
+                'username': user_info.get('username', ''),
+                'first_name': user_info.get('first_name', ''),
+                'total_quizzes_taken': user_info.get('total_quizzes_taken', 0),
+                'total_questions_answered': user_info.get('total_questions_answered', 0),
+                'total_correct_answers': user_info.get('total_correct_answers', 0),
+                'total_points': user_info.get('total_points', 0),
+                'last_activity': datetime.fromisoformat(user_info.get('last_activity', datetime.utcnow().isoformat())),
+                'registration_date': datetime.fromisoformat(user_info.get('registration_date', datetime.utcnow().isoformat()))
+            })
+        
+        # Single executemany INSERT for all new users
+        if user_rows:
+            session.execute(insert(User), user_rows)
+        migrated_users = len(user_rows)
+        print(f"✅ Migrated {migrated_users} users...")
         
         # Migrate leaderboard data
-        migrated_entries = 0
+        known_users = existing_users.union(row['user_id'] for row in user_rows)
+        existing_entries = set(session.execute(
+            select(LeaderboardEntry.period_type, LeaderboardEntry.period_key, LeaderboardEntry.user_id)
+        ).tuples())
+        entry_rows = []
+        orphaned_entries = 0
         for period_type, periods in leaderboard_data.items():
-            if period_type == "all_time":
+            if period_type not in PERIOD_TYPES:
                 continue  # Skip all_time as we removed it
             
             print(f"📈 Migrating {period_type} leaderboard data...")
+            period_code = PERIOD_TYPES[period_type]
             
             for period_key, users in periods.items():
                 for user_id_str, entry_data in users.items():
                     user_id = int(user_id_str)
                     
-                    # Check if entry already exists
-                    existing_entry = session.query(LeaderboardEntry).filter(
-                        LeaderboardEntry.user_id == user_id,
-                        LeaderboardEntry.period_type == period_type,
-                        LeaderboardEntry.period_key == period_key
-                    ).first()
-                    
-                    if existing_entry:
+                    # Skip entries that already exist
+                    if (period_code, period_key, user_id) in existing_entries:
                         continue
                     
-                    # Create leaderboard entry
-                    entry = LeaderboardEntry(
-                        user_id=user_id,
-                        period_type=period_type,
-                        period_key=period_key,
-                        points=entry_data.get('points', 0),
-                        questions_answered=entry_data.get('questions', 0),
-                        correct_answers=entry_data.get('correct', 0)
-                    )
+                    # Foreign keys are enforced, so entries need a user row
+                    if user_id not in known_users:
+                        orphaned_entries += 1
+                        continue
                     
-                    session.add(entry)
-                    migrated_entries += 1
+                    entry_rows.append({
+                        'user_id': user_id,
+                        'period_type': period_code,
+                        'period_key': period_key,
+                        'points': entry_data.get('points', 0),
+                        'questions_answered': entry_data.get('questions', 0),
+                        'correct_answers': entry_data.get('correct', 0)
+                    })
+        
+        if entry_rows:
+            session.execute(insert(LeaderboardEntry), entry_rows)
+        migrated_entries = len(entry_rows)
+        if orphaned_entries:
+            print(f"⚠️  Skipped {orphaned_entries} leaderboard entries without a user")
         
         # Commit all changes
         session.commit()
@@ -143,16 +151,21 @@ def migrate_help_tickets():
         interactions = data.get("interactions", [])
         print(f"📞 Found {len(interactions)} help interactions to migrate")
         
-        migrated_tickets = 0
-        for interaction in interactions:
-            ticket = HelpTicket(
-                user_id=interaction.get('user_id'),
-                username=interaction.get('username', ''),
-                command=interaction.get('command', ''),
-                timestamp=datetime.fromisoformat(interaction.get('timestamp', datetime.utcnow().isoformat()))
-            )
-            session.add(ticket)
-            migrated_tickets += 1
+        ticket_rows = [
+            {
+                'user_id': interaction.get('user_id'),
+                'username': interaction.get('username', ''),
+                'command': interaction.get('command', ''),
+                'timestamp': datetime.fromisoformat(interaction.get('timestamp', datetime.utcnow().isoformat()))
+            }
+            for interaction in interactions
+        ]
+        
+        # Single executemany INSERT for all tickets
+        session.execute(text("PRAGMA synchronous=OFF"))
+        if ticket_rows:
+            session.execute(insert(HelpTicket), ticket_rows)
+        migrated_tickets = len(ticket_rows)
         
         session.commit()
         print(f"✅ Help tickets migrated: {migrated_tickets}")
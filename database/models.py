@@ -3,13 +3,17 @@ Database models for Atenu Quiz Bot
 Using SQLAlchemy with SQLite for local storage
 """
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 Base = declarative_base()
 
+# LeaderboardEntry.period_type values
+PERIOD_DAILY, PERIOD_WEEKLY, PERIOD_MONTHLY = 0, 1, 2
+PERIOD_TYPES = {'daily': PERIOD_DAILY, 'weekly': PERIOD_WEEKLY, 'monthly': PERIOD_MONTHLY}
+
 class User(Base):
     """User table - stores basic user information and overall stats"""
     __tablename__ = 'users'
@@ -21,13 +25,19 @@ class User(Base):
     total_questions_answered = Column(Integer, default=0)
     total_correct_answers = Column(Integer, default=0)
     total_points = Column(Integer, default=0)
-    overall_accuracy = Column(Float, default=0.0)
     last_activity = Column(DateTime, default=datetime.utcnow)
     registration_date = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     answers = relationship("UserAnswer", back_populates="user")
     leaderboard_entries = relationship("LeaderboardEntry", back_populates="user")
+    
+    @property
+    def overall_accuracy(self) -> float:
+        """Percentage of correct answers, derived from the stored counters"""
+        if not self.total_questions_answered:
+            return 0.0
+        return (self.total_correct_answers / self.total_questions_answered) * 100
 
 class UserAnswer(Base):
     """User answers table - stores individual question responses"""
@@ -40,10 +50,17 @@ class UserAnswer(Base):
     correct_answer = Column(Integer, nullable=False)
     is_correct = Column(Boolean, nullable=False)
     points = Column(Integer, nullable=False)
+    attempt_number = Column(Integer, nullable=False, default=1)  # 1 for the first answer to a question
     timestamp = Column(DateTime, default=datetime.utcnow)
     
     # Relationship
     user = relationship("User", back_populates="answers")
+    
+    # One row per attempt; the cooldown check seeks the highest attempt_number
+    # and the (user_id, question_id) prefix serves the "already answered" probe
+    __table_args__ = (
+        Index('uq_ua_user_q_attempt', 'user_id', 'question_id', 'attempt_number', unique=True),
+    )
 
 class LeaderboardEntry(Base):
     """Leaderboard entries - daily, weekly, monthly rankings"""
@@ -51,7 +68,7 @@ class LeaderboardEntry(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
-    period_type = Column(String(10), nullable=False)  # 'daily', 'weekly', 'monthly'
+    period_type = Column(SmallInteger, nullable=False)  # PERIOD_DAILY, PERIOD_WEEKLY, PERIOD_MONTHLY
     period_key = Column(String(20), nullable=False)   # '2025-07-12', '2025-W28', '2025-07'
     points = Column(Integer, default=0)
     questions_answered = Column(Integer, default=0)
@@ -60,9 +77,10 @@ class LeaderboardEntry(Base):
     # Relationship
     user = relationship("User", back_populates="leaderboard_entries")
     
-    # Composite index for fast queries
+    # Composite indexes: one row per user and period, ranked by points
     __table_args__ = (
-        {'mysql_engine': 'InnoDB'}
+        Index('uq_lb_user_period', 'user_id', 'period_type', 'period_key', unique=True),
+        Index('ix_lb_period_points', 'period_type', 'period_key', 'points'),
     )
 
 class HelpTicket(Base):